@@ -0,0 +1,66 @@
+# cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+MISSING = object()      # sentinel so a cached ``None`` can be told apart from a miss
+
+
+class TTLCache:
+    """
+    Size-capped LRU cache whose entries also expire ``ttl`` seconds after they
+    were stored. Plain dict semantics, no locking – it is only touched from the
+    event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Bumped by every pop()/clear() – lets a reader tell that an invalidation
+        # happened while it was fetching the value it is about to store
+        self.generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)      # evict the least recently used
+
+    def set_if_current(self, key: Hashable, value: Any, generation: int) -> None:
+        """
+        Store ``value`` unless something was invalidated since ``generation`` was
+        read. A fetch that overlapped a write may hold the old row – dropping it
+        costs one more fetch, caching it would serve it for the whole TTL.
+        """
+        if generation == self.generation:
+            self[key] = value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        self.generation += 1
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._data.clear()
@@ -1,89 +1,608 @@
 # db_helper.py
 import aiosqlite
-import json
-import time
-from typing import Optional, Dict, Any, AsyncGenerator, Tuple
+import asyncio
+import orjson
+import re
+import sqlite3
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Iterable, Tuple
+
+from data.cache import MISSING, TTLCache
+
+
+POOL_SIZE = 5   # long-lived read-only connections kept open for the whole process
+
+# sqlite3 keeps this many compiled statements per connection (default 128),
+# so repeated queries on a long-lived connection skip parsing and planning
+STATEMENT_CACHE_SIZE = 256
+
+# Bits of voice_channels.flags – one column, flipped atomically with | and & ~
+FLAG_PRIVATE = 1 << 0
+FLAG_LOCKED  = 1 << 1
+
+# unixepoch() and the -> / ->> JSON operators arrived in SQLite 3.38
+MIN_SQLITE_VERSION = (3, 38, 0)
+
+# Stored in PRAGMA user_version – bump whenever init() changes a table or index
+SCHEMA_VERSION = 6
+
+SETTINGS_CACHE_SIZE = 10_000   # entries per settings cache (guild / user / lobby)
+SETTINGS_CACHE_TTL  = 300      # seconds
+
+MISS_CACHE_SIZE = 50_000   # remembered "no such voice channel" lookups
+MISS_CACHE_TTL  = 30       # seconds
+
+ITER_FETCH_SIZE = 512   # rows pulled per worker-thread hop when streaming a table
+
+WRITE_FLUSH_INTERVAL = 0.05   # seconds the batch writer waits to collect writes
+WRITE_BATCH_MAX      = 256    # flush early once this many writes are queued
+
+# Stored in the database file itself – set once by init() on the writer
+PERSISTENT_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+"""
+
+# Writer-only: only a committing connection runs the automatic WAL checkpoint
+WRITER_PRAGMAS = """
+    PRAGMA wal_autocheckpoint = 2000;
+"""
+
+# Session settings, applied once per long-lived connection so the cost is paid at startup only
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -64000;
+    PRAGMA busy_timeout = 30000;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA foreign_keys = ON;
+"""
+
+
+# Foreign keys are enforced – run before writing a row that references guilds
+_ENSURE_GUILD = "INSERT OR IGNORE INTO guilds (guild_id) VALUES (?)"
+
+
+# JSON codec for every settings_json column – swap these two to change it
+def _encode(obj: Any) -> str:
+    """Serialise to JSON text (str, so SQLite stores TEXT rather than BLOB)."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+_decode = orjson.loads
+
+# Settings keys are plain identifiers, dotted for nested values ("NameDefaults.general")
+_SETTINGS_KEY = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+
+@lru_cache(maxsize=256)
+def _json_path(key: str) -> str:
+    """Settings key -> JSON path for the JSON1 functions, built once per key."""
+    if not _SETTINGS_KEY.fullmatch(key):
+        # Anything else ($, [, quotes, …) would be interpreted as JSON path syntax
+        raise ValueError(f"Invalid settings key: {key!r}")
+    return f"$.{key}"
+
+
+@dataclass(slots=True, frozen=True)
+class LobbySettings:
+    """The lobby settings the join flow reads, pulled out of ``settings_json`` once per cache fill."""
+    max_voice_channels: int
+    name_default_general: str
+
+    @classmethod
+    def from_json(cls, settings: Dict[str, Any]) -> Optional["LobbySettings"]:
+        """Returns None when the lobby isn't fully configured yet."""
+        try:
+            return cls(
+                max_voice_channels=int(settings["MaxVoiceChannels"]),
+                name_default_general=str(settings["NameDefaults"]["general"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of long-lived aiosqlite connections.
+
+    Connections are opened once in :meth:`open` and handed out through
+    :meth:`connection`, so the SQLite page cache stays warm between queries.
+    """
+
+    def __init__(
+            self,
+            connection_factory: Callable[[], Awaitable[aiosqlite.Connection]],
+            size: int = POOL_SIZE,
+    ):
+        self._factory = connection_factory
+        self._size = size
+        self._idle: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._all: list[aiosqlite.Connection] = []
+
+    async def open(self) -> None:
+        for _ in range(self._size):
+            conn = await self._factory()
+            self._all.append(conn)
+            self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection; it is returned to the pool on exit."""
+        conn = await self._idle.get()
+        try:
+            yield conn
+        finally:
+            # Never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                await conn.rollback()
+            self._idle.put_nowait(conn)
+
+    async def close(self) -> None:
+        for conn in self._all:
+            await conn.close()
+        self._all.clear()
+        self._idle = asyncio.Queue()
 
 
 class DBHelper:
     """Async wrapper around the SQLite DB used by the bot."""
 
-    def __init__(self, path: str = "utility_bot.db"):
+    def __init__(self, path: str = "utility_bot.db", pool_size: int = POOL_SIZE):
         self.path = path
+        self._pool_size = pool_size
+
+        # SQLite serialises writers anyway – one writer connection, many readers
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: Optional[ConnectionPool] = None
+
+        # Batch writer – (sql, params, future) tuples, committed together
+        self._write_queue: asyncio.Queue[Optional[Tuple[str, tuple, asyncio.Future]]] = asyncio.Queue()
+        self._batch_full = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+
+        # Read-through settings caches, invalidated by every write to the same row.
+        # Cached dicts are shared between callers – treat them as read-only.
+        self._guild_cache = TTLCache(SETTINGS_CACHE_SIZE, SETTINGS_CACHE_TTL)   # guild_id
+        self._user_cache  = TTLCache(SETTINGS_CACHE_SIZE, SETTINGS_CACHE_TTL)   # (guild_id, user_id)
+        self._lobby_cache = TTLCache(SETTINGS_CACHE_SIZE, SETTINGS_CACHE_TTL)   # (guild_id, channel_id) -> lobby row
+
+        # Negative cache: (guild_id, channel_id) keys known NOT to be a voice
+        # channel row, cleared as soon as such a row is inserted
+        self._vc_miss = TTLCache(MISS_CACHE_SIZE, MISS_CACHE_TTL)
+
+        # Every (guild_id, channel_id) lobby – loaded by init(), kept in step by
+        # the lobby writers, so "is this a lobby?" never touches SQLite
+        self._lobby_ids: set[Tuple[int, int]] = set()
+
+        # (guild_id, lobby_id) -> Counter(owner_id -> channel count). Only read and
+        # updated while holding the write lock, so it never races a voice write.
+        self._count_cache: Dict[Tuple[int, int], Counter[int]] = {}
 
     # -------------------------------------------------------------------------------
     #  Initialize the database – creates all if not present
     # -------------------------------------------------------------------------------
     async def init(self) -> None:
-        async with aiosqlite.connect(self.path) as db:
-            await db.executescript(
-                """
-                PRAGMA foreign_keys = ON;
-
-                CREATE TABLE IF NOT EXISTS guilds (
-                    guild_id      INTEGER PRIMARY KEY,
-                    settings_json TEXT NOT NULL DEFAULT '{}'
-                );
-
-                CREATE TABLE IF NOT EXISTS users (
-                    u_id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id       INTEGER NOT NULL,
-                    guild_id      INTEGER NOT NULL,
-                    settings_json TEXT NOT NULL DEFAULT '{}',
-                    UNIQUE (user_id, guild_id),
-                    FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
-                );
-
-                CREATE TABLE IF NOT EXISTS voice_channels (
-                    vc_id           INTEGER PRIMARY KEY AUTOINCREMENT,
-                    channel_id      INTEGER NOT NULL,
-                    guild_id        INTEGER NOT NULL,
-                    lobby_id        INTEGER NOT NULL,
-                    owner_id        INTEGER NOT NULL,
-                    private         BOOL NOT NULL DEFAULT FALSE,
-                    purpose         TEXT,
-                    channel_name    TEXT NOT NULL DEFAULT 'general',
-                    last_dc_time    INTEGER,
-                    settings_json   TEXT NOT NULL DEFAULT '{}',
-                    FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE,
-                    FOREIGN KEY (lobby_id) REFERENCES lobbies(channel_id) ON DELETE CASCADE
-                );
-
-                CREATE TABLE IF NOT EXISTS lobbies (
-                    l_id           INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id       INTEGER NOT NULL,
-                    channel_id     INTEGER NOT NULL,
-                    settings_json  TEXT NOT NULL DEFAULT '{}',
-                    UNIQUE (guild_id, channel_id),
-                    FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
-                );
-                """
+        # on_ready fires again after every reconnect – nothing to redo then
+        if self._readers is not None:
+            return
+
+        # Fail here, not on the first UPDATE or prune, when Python links an older SQLite
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required, "
+                f"this Python is linked against {sqlite3.sqlite_version}"
             )
-            await db.commit()
+
+        if self._writer is None:
+            self._writer = await self._connect()
+            # WAL lets the readers keep going while the writer commits
+            await self._writer.executescript(PERSISTENT_PRAGMAS + WRITER_PRAGMAS)
+
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer_loop())
+
+        async with self._write() as db:
+            # Fast path – the version sits in the file header, so a current
+            # schema skips the DDL (and its write transaction) entirely
+            async with db.execute("PRAGMA user_version") as cur:
+                (version,) = await cur.fetchone()
+
+            if version < SCHEMA_VERSION:
+                # Before v2 users had a surrogate u_id key – move that table aside so
+                # the DDL below creates the keyed one, its rows are copied over after
+                async with db.execute(
+                    "SELECT 1 FROM pragma_table_info('users') WHERE name = 'u_id'"
+                ) as cur:
+                    if await cur.fetchone():
+                        await db.execute("ALTER TABLE users RENAME TO users_v1")
+
+                # Databases created before the flags bitmask still have a ``private``
+                # column – its 0/1 values are exactly FLAG_PRIVATE, so a rename is enough
+                async with db.execute(
+                    "SELECT 1 FROM pragma_table_info('voice_channels') WHERE name = 'private'"
+                ) as cur:
+                    legacy = await cur.fetchone()
+                if legacy:
+                    await db.execute("ALTER TABLE voice_channels RENAME COLUMN private TO flags")
+
+                # Before v3 voice_channels referenced lobbies(channel_id), which is not a
+                # key of lobbies, so with foreign keys on every write to it fails. A
+                # constraint can't be altered – move the table aside like users above
+                # and let the DDL below create it again.
+                async with db.execute(
+                    """
+                    SELECT 1 FROM sqlite_master
+                    WHERE type = 'table' AND name = 'voice_channels'
+                    AND NOT EXISTS (
+                        SELECT 1 FROM pragma_foreign_key_list('voice_channels')
+                        WHERE "table" = 'lobbies' AND "from" = 'guild_id'
+                    )
+                    """
+                ) as cur:
+                    if await cur.fetchone():
+                        await db.execute("ALTER TABLE voice_channels RENAME TO voice_channels_v1")
+
+                # Its indexes moved along – free their names for the new table
+                async with db.execute(
+                    """
+                    SELECT name FROM sqlite_master
+                    WHERE type = 'index' AND tbl_name = 'voice_channels_v1' AND sql IS NOT NULL
+                    """
+                ) as cur:
+                    legacy_indexes = [name for (name,) in await cur.fetchall()]
+                for name in legacy_indexes:
+                    await db.execute(f'DROP INDEX "{name}"')
+
+                # v5/v6 rooms record the name and number their suffix was reserved
+                # under (the v1 copy below leaves both NULL)
+                for column, decl in (("base_name", "TEXT"), ("name_suffix", "INTEGER")):
+                    async with db.execute(
+                        """
+                        SELECT 1 FROM sqlite_master
+                        WHERE type = 'table' AND name = 'voice_channels'
+                        AND NOT EXISTS (
+                            SELECT 1 FROM pragma_table_info('voice_channels') WHERE name = ?
+                        )
+                        """,
+                        (column,),
+                    ) as cur:
+                        missing = await cur.fetchone()
+                    if missing:
+                        await db.execute(f"ALTER TABLE voice_channels ADD COLUMN {column} {decl}")
+
+                # All DDL lands in one explicit transaction instead of one per statement
+                await db.executescript(
+                    """
+                    BEGIN IMMEDIATE;
+
+                    CREATE TABLE IF NOT EXISTS guilds (
+                        guild_id      INTEGER PRIMARY KEY,
+                        settings_json TEXT NOT NULL DEFAULT '{}'
+                    );
+
+                    -- keyed by (user_id, guild_id) itself: one B-tree, no rowid
+                    CREATE TABLE IF NOT EXISTS users (
+                        user_id       INTEGER NOT NULL,
+                        guild_id      INTEGER NOT NULL,
+                        settings_json TEXT NOT NULL DEFAULT '{}',
+                        PRIMARY KEY (user_id, guild_id),
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
+                    ) WITHOUT ROWID;
+
+                    CREATE TABLE IF NOT EXISTS voice_channels (
+                        vc_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                        channel_id      INTEGER NOT NULL,
+                        guild_id        INTEGER NOT NULL,
+                        lobby_id        INTEGER NOT NULL,
+                        owner_id        INTEGER NOT NULL,
+                        flags           INTEGER NOT NULL DEFAULT 0,
+                        purpose         TEXT,
+                        channel_name    TEXT NOT NULL DEFAULT 'general',
+                        last_dc_time    INTEGER,
+                        settings_json   TEXT NOT NULL DEFAULT '{}',
+                        -- room_suffixes entry; both NULL for rooms named by the lobby template
+                        base_name       TEXT,
+                        name_suffix     INTEGER,
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE,
+                        FOREIGN KEY (guild_id, lobby_id) REFERENCES lobbies(guild_id, channel_id) ON DELETE CASCADE
+                    );
+
+                    CREATE TABLE IF NOT EXISTS lobbies (
+                        l_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                        guild_id       INTEGER NOT NULL,
+                        channel_id     INTEGER NOT NULL,
+                        settings_json  TEXT NOT NULL DEFAULT '{}',
+                        UNIQUE (guild_id, channel_id),
+                        FOREIGN KEY (guild_id) REFERENCES guilds(guild_id) ON DELETE CASCADE
+                    );
+
+                    -- voice_channels is always looked up by (guild_id, channel_id) or by owner
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_vc_guild_channel
+                        ON voice_channels(guild_id, channel_id);
+                    CREATE INDEX IF NOT EXISTS idx_vc_owner_guild
+                        ON voice_channels(owner_id, guild_id);
+                    -- expiry range scan; only disconnected channels carry a timestamp
+                    CREATE INDEX IF NOT EXISTS idx_vc_last_dc
+                        ON voice_channels(last_dc_time) WHERE last_dc_time IS NOT NULL;
+                    -- superseded by room_suffixes
+                    DROP INDEX IF EXISTS idx_vc_guild_name;
+                    DROP TRIGGER IF EXISTS trg_vc_release_suffix;
+                    DROP TABLE IF EXISTS room_counters;
+
+                    -- suffix numbers in use per (guild, room base name) – one row per
+                    -- open room, or one being created
+                    CREATE TABLE IF NOT EXISTS room_suffixes (
+                        guild_id   INTEGER NOT NULL,
+                        base_name  TEXT NOT NULL,
+                        n          INTEGER NOT NULL,
+                        PRIMARY KEY (guild_id, base_name, n)
+                    ) WITHOUT ROWID;
+
+                    -- fires for every way a room row goes, ON DELETE CASCADE included
+                    CREATE TRIGGER trg_vc_release_suffix
+                    AFTER DELETE ON voice_channels
+                    WHEN OLD.name_suffix IS NOT NULL
+                    BEGIN
+                        DELETE FROM room_suffixes
+                        WHERE guild_id = OLD.guild_id
+                        AND base_name = OLD.base_name
+                        AND n = OLD.name_suffix;
+                    END;
+                    """
+                )
+
+                async with db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_v1'"
+                ) as cur:
+                    legacy = await cur.fetchone()
+                if legacy:
+                    # users.guild_id is enforced now – older rows may lack a guild row
+                    await db.execute(
+                        "INSERT OR IGNORE INTO guilds (guild_id) SELECT DISTINCT guild_id FROM users_v1"
+                    )
+                    await db.execute(
+                        """
+                        INSERT INTO users (user_id, guild_id, settings_json)
+                        SELECT user_id, guild_id, settings_json FROM users_v1
+                        """
+                    )
+                    await db.execute("DROP TABLE users_v1")
+
+                async with db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'voice_channels_v1'"
+                ) as cur:
+                    legacy = await cur.fetchone()
+                if legacy:
+                    # The new keys are enforced: give every room a guild row, and leave
+                    # out rooms whose lobby is gone – ON DELETE CASCADE would have
+                    # removed them had the old key ever worked
+                    await db.execute(
+                        "INSERT OR IGNORE INTO guilds (guild_id) SELECT DISTINCT guild_id FROM voice_channels_v1"
+                    )
+                    await db.execute(
+                        """
+                        INSERT INTO voice_channels
+                        (vc_id, channel_id, guild_id, lobby_id, owner_id, flags, purpose,
+                         channel_name, last_dc_time, settings_json)
+                        SELECT vc_id, channel_id, guild_id, lobby_id, owner_id, flags, purpose,
+                               channel_name, last_dc_time, settings_json
+                        FROM voice_channels_v1 AS vc
+                        WHERE EXISTS (
+                            SELECT 1 FROM lobbies
+                            WHERE lobbies.guild_id = vc.guild_id
+                            AND lobbies.channel_id = vc.lobby_id
+                        )
+                        """
+                    )
+                    await db.execute("DROP TABLE voice_channels_v1")
+
+                await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                await db.commit()
+
+            async with db.execute("SELECT guild_id, channel_id FROM lobbies") as cur:
+                self._lobby_ids = {(guild_id, channel_id) async for guild_id, channel_id in cur}
+
+        if self._readers is None:
+            readers = ConnectionPool(self._connect_reader, self._pool_size)
+            await readers.open()
+            self._readers = readers
+
+    async def _connect(self, *, read_only: bool = False) -> aiosqlite.Connection:
+        """Open and tune one connection (the writer or a pooled reader)."""
+        if read_only:
+            # Opened with SQLITE_OPEN_READONLY – the writer must have created the file
+            conn = await aiosqlite.connect(
+                f"{Path(self.path).absolute().as_uri()}?mode=ro",
+                uri=True,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+        else:
+            conn = await aiosqlite.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = aiosqlite.Row    # index *and* name access, built in C
+        await conn.executescript(CONNECTION_PRAGMAS)
+        return conn
+
+    async def _connect_reader(self) -> aiosqlite.Connection:
+        return await self._connect(read_only=True)
+
+    @asynccontextmanager
+    async def _write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Exclusive access to the single writer connection."""
+        async with self._write_lock:
+            try:
+                yield self._writer
+            finally:
+                if self._writer.in_transaction:
+                    await self._writer.rollback()
+
+    async def optimize(self) -> None:
+        """
+        Let SQLite refresh the planner statistics it thinks are stale (cheap when
+        nothing is) and checkpoint the WAL as far as open readers allow.
+        """
+        async with self._write() as db:
+            await db.execute("PRAGMA optimize")
+            await db.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    async def close(self) -> None:
+        """Flush queued writes and close every connection – call once on bot shutdown."""
+        if self._writer_task is not None:
+            self._write_queue.put_nowait(None)   # sentinel: flush and stop
+            self._batch_full.set()
+            await self._writer_task
+            self._writer_task = None
+
+        if self._readers is not None:
+            await self._readers.close()
+            self._readers = None
+
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    # -------------------------------------------------------------------------------
+    #  BATCH writer – coalesces small writes into one transaction
+    # -------------------------------------------------------------------------------
+    async def _submit_write(self, sql: str, params: tuple) -> None:
+        """Queue one write statement and wait until its batch is committed."""
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((sql, params, future))
+        if self._write_queue.qsize() >= WRITE_BATCH_MAX:
+            self._batch_full.set()
+        await future
+
+    async def _writer_loop(self) -> None:
+        """Background task: every tick drains the queue into a single transaction."""
+        while True:
+            item = await self._write_queue.get()
+            if item is None:
+                return
+            batch = [item]
+
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), WRITE_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+
+            stop = False
+            while len(batch) < WRITE_BATCH_MAX and not self._write_queue.empty():
+                item = self._write_queue.get_nowait()
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._flush_writes(batch)
+            if stop:
+                return
+
+    async def _flush_writes(self, batch: list[Tuple[str, tuple, asyncio.Future]]) -> None:
+        errors: list[Optional[Exception]] = []
+        try:
+            async with self._write() as db:
+                await db.execute("BEGIN IMMEDIATE")
+                for sql, params, _ in batch:
+                    try:
+                        await db.execute(sql, params)
+                        errors.append(None)
+                    except sqlite3.Error as e:
+                        # SQLite only rolls back the failing statement, the rest still commits
+                        errors.append(e)
+                await db.commit()
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), error in zip(batch, errors):
+            if future.done():
+                continue            # caller gave up waiting
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    async def _submit_user_write(self, guild_id: int, sql: str, params: tuple) -> None:
+        """
+        Queue a write to ``users`` together with the guild row its foreign key
+        needs – queued back to back, so the writer commits them in this order.
+        """
+        await asyncio.gather(
+            self._submit_write(_ENSURE_GUILD, (guild_id,)),
+            self._submit_write(sql, params),
+        )
+
+    async def _fetch_setting(self, sql: str, params: tuple, key: str, default: Any) -> Any:
+        """
+        Run a ``SELECT settings_json -> ?`` style query and decode just that value.
+        SQLite extracts the key, so only the requested value crosses into Python.
+        """
+        async with self._readers.connection() as db:
+            async with db.execute(sql, (_json_path(key), *params)) as cur:
+                row = await cur.fetchone()
+
+        if row is None or row[0] is None:
+            return default      # no row, or the key is missing
+        return _decode(row[0])
 
     # -------------------------------------------------------------------------------
     #  GUILD helpers
     # -------------------------------------------------------------------------------
     async def get_settings_guild(self, guild_id: int) -> Dict[str, Any]:
         """Return the JSON dict stored in guilds.settings_json. Creates row if missing."""
-        async with aiosqlite.connect(self.path) as db:
+        settings = self._guild_cache.get(guild_id, MISSING)
+        if settings is not MISSING:
+            return settings
+
+        generation = self._guild_cache.generation
+        async with self._readers.connection() as db:
             async with db.execute(
                 "SELECT settings_json FROM guilds WHERE guild_id = ?", (guild_id,)
             ) as cur:
                 row = await cur.fetchone()
-                if row:
-                    return json.loads(row[0])
 
-                # No row yet – create a default one
-                await db.execute("INSERT INTO guilds (guild_id) VALUES (?)", (guild_id,))
+        if row:
+            settings = _decode(row[0])
+        else:
+            # No row yet – create a default one (readers are read-only)
+            async with self._write() as db:
+                await db.execute("INSERT OR IGNORE INTO guilds (guild_id) VALUES (?)", (guild_id,))
                 await db.commit()
-                return {}
+            settings = {}
+
+        self._guild_cache.set_if_current(guild_id, settings, generation)
+        return settings
+
+    async def get_guild_setting(self, guild_id: int, key: str, default: Any = None) -> Any:
+        """Return one key of the guild settings (dotted keys reach nested values)."""
+        return await self._fetch_setting(
+            "SELECT settings_json -> ? FROM guilds WHERE guild_id = ?",
+            (guild_id,), key, default,
+        )
+
+    async def get_all_settings_guilds(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Return ``{guild_id: settings}`` for every guild. SQLite aggregates the rows
+        into a single JSON object, so Python decodes one blob instead of one per row.
+        """
+        async with self._readers.connection() as db:
+            async with db.execute(
+                "SELECT json_group_object(guild_id, json(settings_json)) FROM guilds"
+            ) as cur:
+                row = await cur.fetchone()
+
+        return {int(guild_id): settings for guild_id, settings in _decode(row[0]).items()}
 
     async def set_settings_guild(self, guild_id: int, settings: Dict[str, Any]) -> None:
         """
         Replace the whole ``settings_json`` for a guild with the supplied dict.
         """
-        async with aiosqlite.connect(self.path) as db:
+        async with self._write() as db:
             await db.execute(
                 """
                 INSERT INTO guilds (guild_id, settings_json)
@@ -91,16 +610,58 @@ class DBHelper:
                 ON CONFLICT(guild_id) DO UPDATE
                 SET settings_json = excluded.settings_json
                 """,
-                (guild_id, json.dumps(settings)),
+                (guild_id, _encode(settings)),
+            )
+            await db.commit()
+        self._guild_cache.pop(guild_id)
+
+    async def update_guild_setting(self, guild_id: int, key: str, value: Any) -> None:
+        """
+        Set a single JSON key for a guild (row is created if missing).
+        Only the changed value is encoded – SQLite rewrites the blob in place.
+        """
+        async with self._write() as db:
+            await db.execute(
+                """
+                INSERT INTO guilds (guild_id, settings_json)
+                VALUES (?1, json_set('{}', ?2, json(?3)))
+                ON CONFLICT(guild_id) DO UPDATE
+                SET settings_json = json_set(guilds.settings_json, ?2, json(?3))
+                """,
+                (guild_id, _json_path(key), _encode(value)),
+            )
+            await db.commit()
+        self._guild_cache.pop(guild_id)
+
+    async def merge_settings_guild(self, guild_id: int, patch: Dict[str, Any]) -> None:
+        """
+        Merge ``patch`` into the guild settings with ``json_patch`` (RFC 7396 –
+        a ``None`` value removes that key).
+        """
+        async with self._write() as db:
+            await db.execute(
+                """
+                INSERT INTO guilds (guild_id, settings_json)
+                VALUES (?1, json_patch('{}', ?2))
+                ON CONFLICT(guild_id) DO UPDATE
+                SET settings_json = json_patch(guilds.settings_json, ?2)
+                """,
+                (guild_id, _encode(patch)),
             )
             await db.commit()
+        self._guild_cache.pop(guild_id)
 
     # -------------------------------------------------------------------------------
     #  USER helpers (note: uid is auto‑generated, we work with user_id and guild_id)
     # -------------------------------------------------------------------------------
     async def get_settings_user(self, guild_id: int, user_id: int) -> None | Dict[str, Any]:
         """Fetch settings_json for a (user_id, guild_id) pair. Returns None if missing."""
-        async with aiosqlite.connect(self.path) as db:
+        settings = self._user_cache.get((guild_id, user_id), MISSING)
+        if settings is not MISSING:
+            return settings
+
+        generation = self._user_cache.generation
+        async with self._readers.connection() as db:
             async with db.execute(
                 """
                 SELECT settings_json FROM users
@@ -109,10 +670,22 @@ class DBHelper:
                 (guild_id, user_id),
             ) as cur:
                 row = await cur.fetchone()
-                if row:
-                    return json.loads(row[0])
 
-                return None
+        settings = _decode(row[0]) if row else None
+        self._user_cache.set_if_current((guild_id, user_id), settings, generation)
+        return settings
+
+    async def get_user_setting(
+            self, guild_id: int, user_id: int, key: str, default: Any = None
+    ) -> Any:
+        """Return one key of a user's settings without decoding the whole blob."""
+        return await self._fetch_setting(
+            """
+            SELECT settings_json -> ? FROM users
+            WHERE guild_id = ? AND user_id = ?
+            """,
+            (guild_id, user_id), key, default,
+        )
 
     async def set_settings_user(
             self, guild_id: int, user_id: int, settings: Dict[str, Any]
@@ -121,18 +694,73 @@ class DBHelper:
         Replace the whole ``settings_json`` for a user‑in‑guild row.
         If the row does not exist, yet it will be created.
         """
-        async with aiosqlite.connect(self.path) as db:
-            await db.execute(
+        await self._submit_user_write(
+            guild_id,
+            """
+            INSERT INTO users (user_id, guild_id, settings_json)
+            VALUES (?, ?, ?) ON CONFLICT(user_id, guild_id) DO
+            UPDATE
+                SET settings_json = excluded.settings_json
+            """,
+            (user_id, guild_id, _encode(settings)),
+        )
+        self._user_cache.pop((guild_id, user_id))
+
+    async def update_user_setting(
+            self, guild_id: int, user_id: int, key: str, value: Any
+    ) -> None:
+        """Set a single JSON key for a user‑in‑guild row (row is created if missing)."""
+        await self._submit_user_write(
+            guild_id,
+            """
+            INSERT INTO users (user_id, guild_id, settings_json)
+            VALUES (?1, ?2, json_set('{}', ?3, json(?4))) ON CONFLICT(user_id, guild_id) DO
+            UPDATE
+                SET settings_json = json_set(users.settings_json, ?3, json(?4))
+            """,
+            (user_id, guild_id, _json_path(key), _encode(value)),
+        )
+        self._user_cache.pop((guild_id, user_id))
+
+    async def merge_settings_user(
+            self, guild_id: int, user_id: int, patch: Dict[str, Any]
+    ) -> None:
+        """Merge ``patch`` into a user's settings with ``json_patch``."""
+        await self._submit_user_write(
+            guild_id,
+            """
+            INSERT INTO users (user_id, guild_id, settings_json)
+            VALUES (?1, ?2, json_patch('{}', ?3)) ON CONFLICT(user_id, guild_id) DO
+            UPDATE
+                SET settings_json = json_patch(users.settings_json, ?3)
+            """,
+            (user_id, guild_id, _encode(patch)),
+        )
+        self._user_cache.pop((guild_id, user_id))
+
+    async def set_settings_users_bulk(
+            self, rows: Iterable[Tuple[int, int, Dict[str, Any]]]
+    ) -> None:
+        """Upsert many ``(guild_id, user_id, settings)`` rows in ONE transaction."""
+        params = [(user_id, guild_id, _encode(settings)) for guild_id, user_id, settings in rows]
+
+        async with self._write() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            await db.executemany(_ENSURE_GUILD, {(guild_id,) for _, guild_id, _ in params})
+            await db.executemany(
                 """
                 INSERT INTO users (user_id, guild_id, settings_json)
                 VALUES (?, ?, ?) ON CONFLICT(user_id, guild_id) DO
                 UPDATE
                     SET settings_json = excluded.settings_json
                 """,
-                (user_id, guild_id, json.dumps(settings)),
+                params,
             )
             await db.commit()
 
+        for user_id, guild_id, _ in params:
+            self._user_cache.pop((guild_id, user_id))
+
     # -------------------------------------------------------------------------------
     #  VOICE‑CHANNEL helpers
     # -------------------------------------------------------------------------------
@@ -144,43 +772,95 @@ class DBHelper:
             owner_id: int,
             purpose: Optional[str] = None,
             channel_name: str = "general",
-            private: bool = False,
+            flags: int = 0,
             extra: Optional[Dict[str, Any]] = None,
+            base_name: Optional[str] = None,
+            name_suffix: Optional[int] = None,
     ) -> int:
         """
-        Insert a new temporary voice‑channel row.
+        Insert a new temporary voice‑channel row. ``flags`` is a mask of ``FLAG_*`` bits,
+        ``base_name``/``name_suffix`` the number reserved with :meth:`next_room_suffix`
+        (deleting the row releases it).
         Returns the autogenerated ``vc_id`` (the primary key of the table).
         """
-        settings = json.dumps(extra or {})
+        # Empty settings skip the encoder – coalesce() stores the '{}' default
+        settings = _encode(extra) if extra else None
 
-        async with aiosqlite.connect(self.path) as db:
+        async with self._write() as db:
             cursor = await db.execute(
                 """
                 INSERT INTO voice_channels
-                (channel_id, guild_id, lobby_id, owner_id, private, purpose,
-                 channel_name, settings_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                (channel_id, guild_id, lobby_id, owner_id, flags, purpose,
+                 channel_name, settings_json, base_name, name_suffix)
+                VALUES (?, ?, ?, ?, ?, ?, ?, coalesce(?, '{}'), ?, ?)
                 """,
                 (
                     channel_id,
                     guild_id,
                     lobby_id,
                     owner_id,
-                    int(private),
+                    flags,
                     purpose,
                     channel_name,
                     settings,
+                    base_name,
+                    name_suffix,
                 ),
             )
             await db.commit()
-            return cursor.lastrowid  # this is the vc_id
+            self._adjust_voice_count(guild_id, lobby_id, owner_id, +1)
+        self._vc_miss.pop((guild_id, channel_id))
+        return cursor.lastrowid  # this is the vc_id
+
+    async def set_voice_channels_bulk(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Insert many voice‑channel rows in ONE transaction (e.g. when reloading
+        persisted channels). Each row is a dict with the keyword arguments of
+        :meth:`set_voice_channel`.
+        """
+        params = [
+            (
+                r["channel_id"],
+                r["guild_id"],
+                r["lobby_id"],
+                r["owner_id"],
+                r.get("flags", 0),
+                r.get("purpose"),
+                r.get("channel_name", "general"),
+                _encode(r["extra"]) if r.get("extra") else None,
+                r.get("base_name"),
+                r.get("name_suffix"),
+            )
+            for r in rows
+        ]
+
+        async with self._write() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            await db.executemany(
+                """
+                INSERT INTO voice_channels
+                (channel_id, guild_id, lobby_id, owner_id, flags, purpose,
+                 channel_name, settings_json, base_name, name_suffix)
+                VALUES (?, ?, ?, ?, ?, ?, ?, coalesce(?, '{}'), ?, ?)
+                """,
+                params,
+            )
+            await db.commit()
+            for channel_id, guild_id, lobby_id, owner_id, *_ in params:
+                self._adjust_voice_count(guild_id, lobby_id, owner_id, +1)
+                self._vc_miss.pop((guild_id, channel_id))
 
     async def get_voice_channel(self, guild_id: int, channel_id: int) -> Optional[Dict[str, Any]]:
         """Fetch a voice‑channel row by its Discord ``channel_id``."""
-        async with aiosqlite.connect(self.path) as db:
+        if (guild_id, channel_id) in self._vc_miss:
+            return None     # recently looked up and not a temp channel
+
+        generation = self._vc_miss.generation
+        async with self._readers.connection() as db:
             async with db.execute(
                 """
-                SELECT *
+                SELECT vc_id, channel_id, guild_id, owner_id, flags, purpose,
+                       channel_name, last_dc_time, settings_json
                 FROM voice_channels
                 WHERE channel_id = ?
                 AND guild_id = ?
@@ -188,29 +868,75 @@ class DBHelper:
                 (channel_id, guild_id),
             ) as cur:
                 row = await cur.fetchone()
-                if not row:
-                    return None
 
-                cols = [d[0] for d in cur.description]
-                data = dict(zip(cols, row))
-                # Decode the JSON payload
-                data["settings_json"] = json.loads(data.pop("settings_json") or "{}")
-                return data
+        if not row:
+            # Not if a row was inserted meanwhile – the miss would hide it for the TTL
+            self._vc_miss.set_if_current((guild_id, channel_id), True, generation)
+            return None
+
+        # Positional unpack into a dict literal – no per-row keys() walk
+        vc_id, channel_id, guild_id, owner_id, flags, purpose, channel_name, last_dc_time, settings_json = row
+        return {
+            "vc_id": vc_id,
+            "channel_id": channel_id,
+            "guild_id": guild_id,
+            "owner_id": owner_id,
+            "flags": flags,
+            "purpose": purpose,
+            "channel_name": channel_name,
+            "last_dc_time": last_dc_time,
+            "settings_json": _decode(settings_json or "{}"),
+        }
+
+    async def get_voice_channel_setting(
+            self, guild_id: int, channel_id: int, key: str, default: Any = None
+    ) -> Any:
+        """Return one key of a voice channel's ``settings_json``."""
+        return await self._fetch_setting(
+            """
+            SELECT settings_json -> ? FROM voice_channels
+            WHERE channel_id = ? AND guild_id = ?
+            """,
+            (channel_id, guild_id), key, default,
+        )
+
+    async def _voice_counts(self, guild_id: int, lobby_id: int) -> Counter[int]:
+        """
+        Per-owner channel counts for one lobby. Served from memory; a miss loads
+        every owner of the lobby with one ``GROUP BY`` query on the writer, so the
+        snapshot cannot interleave with an insert/delete.
+        """
+        counts = self._count_cache.get((guild_id, lobby_id))
+        if counts is not None:
+            return counts
+
+        async with self._write() as db:
+            counts = self._count_cache.get((guild_id, lobby_id))   # filled while we waited?
+            if counts is None:
+                async with db.execute(
+                    """
+                    SELECT owner_id, COUNT(vc_id) FROM voice_channels
+                    WHERE guild_id = ?
+                    AND lobby_id = ?
+                    GROUP BY owner_id
+                    """,
+                    (guild_id, lobby_id),
+                ) as cur:
+                    counts = Counter({owner_id: n async for owner_id, n in cur})
+                self._count_cache[(guild_id, lobby_id)] = counts
+            return counts
+
+    def _adjust_voice_count(self, guild_id: int, lobby_id: int, owner_id: int, delta: int) -> None:
+        """Keep a cached lobby count in step with a committed insert/delete (writer only)."""
+        counts = self._count_cache.get((guild_id, lobby_id))
+        if counts is not None:
+            counts[owner_id] += delta
+            if counts[owner_id] <= 0:
+                del counts[owner_id]
 
     async def get_count_voice_channel_by_member(self, guild_id: int, member_id: int, lobby_id: int) -> int:
-        """Fetch a voice‑channel row by its Discord ``channel_id``."""
-        async with aiosqlite.connect(self.path) as db:
-            async with db.execute(
-                """
-                SELECT COUNT(vc_id) FROM voice_channels
-                WHERE owner_id = ?
-                AND guild_id = ?
-                AND lobby_id = ?
-                """,
-                (member_id, guild_id, lobby_id),
-            ) as cur:
-                row = await cur.fetchone()
-                return row[0]
+        """Number of voice channels ``member_id`` owns in the given lobby."""
+        return (await self._voice_counts(guild_id, lobby_id))[member_id]
 
     async def get_count_voice_channels(self, guild_id: int, lobby_id: int) -> int:
         """
@@ -218,17 +944,91 @@ class DBHelper:
         :param lobby_id:
         :return: The number of active voice channels in given guild.
         """
-        async with aiosqlite.connect(self.path) as db:
+        return (await self._voice_counts(guild_id, lobby_id)).total()
+
+    async def get_lobby_join_context(
+            self, guild_id: int, lobby_id: int, member_id: int
+    ) -> Optional[Tuple[Dict[str, Any], int, int]]:
+        """
+        Everything a lobby join needs in one call: the lobby row, how many channels
+        ``member_id`` owns in it and how many it has in total – or None if
+        ``lobby_id`` is not a lobby. Both counts come from the same snapshot.
+        """
+        lobby = await self.get_lobby(guild_id, lobby_id)
+        if lobby is None:
+            return None
+
+        counts = await self._voice_counts(guild_id, lobby_id)
+        return lobby, counts[member_id], counts.total()
+
+    async def next_room_suffix(self, guild_id: int, base_name: str) -> int:
+        """
+        Reserve the lowest number (1, 2, …) no open room called ``base_name`` in
+        a guild is using. One ``INSERT … SELECT`` picks and takes it, so
+        concurrent callers never get the same number. Store the room with the
+        same ``base_name``/``name_suffix`` – deleting its row hands the number
+        back – or call :meth:`release_room_suffix` if it is never stored.
+        """
+        async with self._write() as db:
             async with db.execute(
                 """
-                SELECT COUNT(vc_id) FROM voice_channels
-                WHERE guild_id = ?
-                AND lobby_id = ?
+                INSERT INTO room_suffixes (guild_id, base_name, n)
+                SELECT ?1, ?2, coalesce(
+                    -- 1 if free, else the first number whose successor is free
+                    (SELECT 1 WHERE NOT EXISTS (
+                        SELECT 1 FROM room_suffixes
+                        WHERE guild_id = ?1 AND base_name = ?2 AND n = 1
+                    )),
+                    (SELECT min(used.n) + 1 FROM room_suffixes AS used
+                     WHERE used.guild_id = ?1 AND used.base_name = ?2
+                     AND NOT EXISTS (
+                        SELECT 1 FROM room_suffixes
+                        WHERE guild_id = ?1 AND base_name = ?2 AND n = used.n + 1
+                     ))
+                )
+                RETURNING n
+                """,
+                (guild_id, base_name),
+            ) as cur:
+                (n,) = await cur.fetchone()
+            await db.commit()
+        return n
+
+    async def release_room_suffix(self, guild_id: int, base_name: str, n: int) -> None:
+        """Give back a number from :meth:`next_room_suffix` whose room was never stored."""
+        async with self._write() as db:
+            await db.execute(
+                """
+                DELETE FROM room_suffixes
+                WHERE guild_id = ? AND base_name = ? AND n = ?
+                """,
+                (guild_id, base_name, n),
+            )
+            await db.commit()
+
+    async def update_voice_channel_flags(
+        self, guild_id: int, channel_id: int, *,
+        set_mask: int = 0, clear_mask: int = 0, toggle_mask: int = 0,
+    ) -> Optional[int]:
+        """
+        Set, clear and/or flip ``FLAG_*`` bits in one UPDATE (applied in that order).
+        Returns the new flags, or None if the channel is unknown.
+        """
+        async with self._write() as db:
+            async with db.execute(
+                """
+                UPDATE voice_channels
+                -- SQLite has no XOR: a ^ b == (a | b) & ~(a & b)
+                SET flags = (((flags | ?1) & ~?2) | ?3) & ~(((flags | ?1) & ~?2) & ?3)
+                WHERE guild_id = ?4
+                AND channel_id = ?5
+                RETURNING flags
                 """,
-                (guild_id, lobby_id)
+                (set_mask, clear_mask, toggle_mask, guild_id, channel_id),
             ) as cur:
                 row = await cur.fetchone()
-                return row[0]
+            await db.commit()
+        return row[0] if row else None
 
     async def set_voice_channel_settings(
         self, channel_id: int, settings: Dict[str, Any]
@@ -236,16 +1036,28 @@ class DBHelper:
         """
         Replace the whole ``settings_json`` for a temporary voice channel.
         """
-        async with aiosqlite.connect(self.path) as db:
-            await db.execute(
-                """
-                UPDATE voice_channels
-                SET settings_json = ?
-                WHERE channel_id = ?
-                """,
-                (json.dumps(settings), channel_id),
-            )
-            await db.commit()
+        await self._submit_write(
+            """
+            UPDATE voice_channels
+            SET settings_json = ?
+            WHERE channel_id = ?
+            """,
+            (_encode(settings), channel_id),
+        )
+
+    async def update_voice_channel_setting(
+        self, guild_id: int, channel_id: int, key: str, value: Any
+    ) -> None:
+        """Set a single JSON key of a voice channel's ``settings_json``."""
+        await self._submit_write(
+            """
+            UPDATE voice_channels
+            SET settings_json = json_set(settings_json, ?, json(?))
+            WHERE channel_id = ?
+            AND guild_id = ?
+            """,
+            (_json_path(key), _encode(value), channel_id, guild_id),
+        )
 
     async def update_voice_last_disconnect(
         self, guild_id: int, channel_id: int, timestamp: Optional[int] = None
@@ -254,26 +1066,25 @@ class DBHelper:
         Update the ``last_dc_time`` column (used for expiry or “when did it close”).
         If ``timestamp`` is omitted the current epoch seconds are used.
         """
-        async with aiosqlite.connect(self.path) as db:
-            await db.execute(
-                """
-                UPDATE voice_channels
-                SET last_dc_time = ?
-                WHERE channel_id = ?
-                AND guild_id = ?
-                """,
-                (timestamp, channel_id, guild_id),
-            )
-            await db.commit()
+        await self._submit_write(
+            """
+            UPDATE voice_channels
+            SET last_dc_time = coalesce(?, unixepoch())
+            WHERE channel_id = ?
+            AND guild_id = ?
+            """,
+            (timestamp, channel_id, guild_id),
+        )
 
-    async def iterate_voice_rows(self) -> AsyncGenerator[Tuple[int, int, int, Dict[str, Any]], None]:
+    async def iterate_voice_rows(self) -> AsyncGenerator[Tuple[int, int, int, Optional[int], str], None]:
         """
         Async generator that yields (guild_id, channel_id, lobby_id, last_dc_time, settings_json) for every voice‑channel.
 
-        The generator opens a cursor **once** and streams rows one at a time,
-        so the DB can be updated while we are iterating.
+        The generator opens a cursor **once** and streams rows in chunks of
+        ``ITER_FETCH_SIZE``, so the DB can be updated while we are iterating
+        without paying one aiosqlite thread hop per row.
         """
-        async with aiosqlite.connect(self.path) as conn:
+        async with self._readers.connection() as conn:
             # Use a *forward‑only* cursor – we never need random access.
             async with conn.execute(
                     """
@@ -282,33 +1093,120 @@ class DBHelper:
                     """,
                     (),
             ) as cur:
-                async for row in cur:  # yields each row as a tuple
-                    yield row  # (guild_id, channel_id, lobby_id, last_dc_time, settings_json)
+                while rows := await cur.fetchmany(ITER_FETCH_SIZE):
+                    for row in rows:
+                        yield row  # Row(guild_id, channel_id, lobby_id, last_dc_time, settings_json)
+
+    async def iter_expired_voice_pages(
+            self, page_size: int = ITER_FETCH_SIZE, now: Optional[int] = None
+    ) -> AsyncGenerator[list[Tuple[int, int]], None]:
+        """
+        Yield ``(guild_id, channel_id)`` of every voice channel whose
+        ``last_dc_time`` has passed, ordered by guild, in pages of ``page_size``.
+
+        Each page is its own keyset query (``WHERE (guild_id, channel_id) > last``),
+        so no reader connection or snapshot is held while the caller works on a
+        page, and rows deleted in between don't shift the next one.
+
+        :param now: Epoch seconds to compare ``last_dc_time`` against
+                    (default: SQLite's ``unixepoch()``).
+        """
+        last = (-1, -1)
+        while True:
+            async with self._readers.connection() as db:
+                async with db.execute(
+                    """
+                    SELECT guild_id, channel_id FROM voice_channels
+                    WHERE (guild_id, channel_id) > (?, ?)
+                    AND last_dc_time IS NOT NULL
+                    AND last_dc_time <= coalesce(?, unixepoch())
+                    ORDER BY guild_id, channel_id
+                    LIMIT ?
+                    """,
+                    (*last, now, page_size),
+                ) as cur:
+                    page = [(guild_id, channel_id) for guild_id, channel_id in await cur.fetchall()]
+
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            last = page[-1]
 
-    async def check_voice_expiration(self) -> Dict[str, Any]:
+    async def check_voice_expiration(self, now: Optional[int] = None) -> Dict[int, list[int]]:
         """
         Checks expirations of ALL voice channels on every guild this bot is on
-        and deletes all expired voice channels.
+        and deletes all expired voice channels – one ``DELETE … RETURNING``
+        statement and one commit, however many rows expire.
 
+        :param now: Epoch seconds to compare ``last_dc_time`` against
+                    (default: SQLite's ``unixepoch()``).
         :return: Dict with KV pair of deleted guilds (K) and channels (V).
         """
+        expired: Dict[int, list[int]] = {}
+        async with self._write() as db:
+            async with db.execute(
+                """
+                DELETE FROM voice_channels
+                WHERE last_dc_time IS NOT NULL
+                AND last_dc_time <= coalesce(?, unixepoch())
+                RETURNING guild_id, channel_id, lobby_id, owner_id
+                """,
+                (now,),
+            ) as cur:
+                deleted = await cur.fetchall()
+            await db.commit()
+            for guild_id, channel_id, lobby_id, owner_id in deleted:
+                expired.setdefault(guild_id, []).append(channel_id)
+                self._adjust_voice_count(guild_id, lobby_id, owner_id, -1)
+        return expired
 
     async def delete_voice_channel(self, guild_id: int, channel_id: int) -> None:
         """
         Remove ONE voice‑channel entry identified by the (guild_id, channel_id)
         pair.
         """
-        async with aiosqlite.connect(self.path) as db:
-            await db.execute(
+        async with self._write() as db:
+            async with db.execute(
                 """
                 DELETE
                 FROM voice_channels
                 WHERE guild_id = ?
                 AND channel_id = ?
+                RETURNING lobby_id, owner_id
                 """,
                 (guild_id, channel_id),
-            )
+            ) as cur:
+                deleted = await cur.fetchall()
+            await db.commit()
+            for lobby_id, owner_id in deleted:
+                self._adjust_voice_count(guild_id, lobby_id, owner_id, -1)
+
+    async def delete_voice_channels_bulk(self, keys: Iterable[Tuple[int, int]]) -> None:
+        """
+        Remove many ``(guild_id, channel_id)`` voice‑channel entries with ONE
+        ``DELETE`` – the keys travel as a single JSON array bound to one parameter.
+        """
+        keys = list(keys)
+        if not keys:
+            return
+
+        async with self._write() as db:
+            async with db.execute(
+                """
+                DELETE
+                FROM voice_channels
+                WHERE (guild_id, channel_id) IN (
+                    SELECT value ->> 0, value ->> 1 FROM json_each(?)
+                )
+                RETURNING guild_id, lobby_id, owner_id
+                """,
+                (_encode(keys),),
+            ) as cur:
+                deleted = await cur.fetchall()
             await db.commit()
+            for guild_id, lobby_id, owner_id in deleted:
+                self._adjust_voice_count(guild_id, lobby_id, owner_id, -1)
 
     # -------------------------------------------------------------------------------
     #  LOBBY helpers (unchanged except for naming consistency)
@@ -321,25 +1219,67 @@ class DBHelper:
     ) -> int:
         """
         Insert a lobby for a given channel.
+        Without ``settings_json`` the lobby starts from a copy of the guild's
+        settings, read inside the same statement.
         Returns the autogenerated ``lobby_id``.
         """
-        settings = json.dumps(settings_json or {})
-        async with aiosqlite.connect(self.path) as db:
+        settings = _encode(settings_json) if settings_json is not None else None
+        async with self._write() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            await db.execute(_ENSURE_GUILD, (guild_id,))
             cursor = await db.execute(
                 """
                 INSERT INTO lobbies (guild_id, channel_id, settings_json)
-                VALUES (?, ?, ?)
+                VALUES (?1, ?2, coalesce(?3, (SELECT settings_json FROM guilds WHERE guild_id = ?1)))
                 """,
                 (guild_id, channel_id, settings),
             )
             await db.commit()
-            return cursor.lastrowid
+            self._lobby_ids.add((guild_id, channel_id))
+        self._lobby_cache.pop((guild_id, channel_id))
+        return cursor.lastrowid
+
+    async def set_lobbies_bulk(
+        self, rows: Iterable[Tuple[int, int, Optional[Dict[str, Any]]]]
+    ) -> None:
+        """Insert many ``(guild_id, channel_id, settings_json)`` lobbies in ONE transaction."""
+        params = [
+            (guild_id, channel_id, _encode(settings) if settings is not None else None)
+            for guild_id, channel_id, settings in rows
+        ]
+
+        async with self._write() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            await db.executemany(_ENSURE_GUILD, {(guild_id,) for guild_id, _, _ in params})
+            await db.executemany(
+                """
+                INSERT INTO lobbies (guild_id, channel_id, settings_json)
+                VALUES (?1, ?2, coalesce(?3, (SELECT settings_json FROM guilds WHERE guild_id = ?1)))
+                """,
+                params,
+            )
+            await db.commit()
+            for guild_id, channel_id, _ in params:
+                self._lobby_ids.add((guild_id, channel_id))
+                self._lobby_cache.pop((guild_id, channel_id))
+
+    def is_lobby(self, guild_id: int, channel_id: int) -> bool:
+        """O(1), in-memory check whether a channel is a lobby."""
+        return (guild_id, channel_id) in self._lobby_ids
 
     async def get_lobby(
         self, guild_id: int, channel_id: int
     ) -> Optional[Dict[str, Any]]:
         """Retrieve a lobby row (or None)."""
-        async with aiosqlite.connect(self.path) as db:
+        if (guild_id, channel_id) not in self._lobby_ids:
+            return None
+
+        lobby = self._lobby_cache.get((guild_id, channel_id))
+        if lobby is not None:
+            return lobby
+
+        generation = self._lobby_cache.generation
+        async with self._readers.connection() as db:
             async with db.execute(
                 """
                 SELECT l_id, settings_json
@@ -349,46 +1289,57 @@ class DBHelper:
                 (guild_id, channel_id),
             ) as cur:
                 row = await cur.fetchone()
-                if not row:
-                    return None
-                l_id, settings_json = row
-                return {
-                    "l_id": l_id,
-                    "guild_id": guild_id,
-                    "channel_id": channel_id,
-                    "settings_json": json.loads(settings_json or "{}"),
-                }
+
+        if not row:
+            return None
+        l_id, settings_json = row
+        settings = _decode(settings_json or "{}")
+        lobby = {
+            "l_id": l_id,
+            "guild_id": guild_id,
+            "channel_id": channel_id,
+            "settings_json": settings,
+            "settings": LobbySettings.from_json(settings),   # None if not configured
+        }
+        self._lobby_cache.set_if_current((guild_id, channel_id), lobby, generation)
+        return lobby
 
     async def get_settings_lobby(self, guild_id: int, channel_id: int) -> Dict[str, Any]:
-        """Return the JSON dict stored in lobbies.settings_json. Creates row if missing."""
-        async with aiosqlite.connect(self.path) as db:
-            async with db.execute(
-                "SELECT settings_json FROM lobbies WHERE guild_id = ?", (guild_id,)
-            ) as cur:
-                row = await cur.fetchone()
-                if row:
-                    return json.loads(row[0])
+        """Return the JSON dict stored in lobbies.settings_json ({} if there is no such lobby)."""
+        lobby = await self.get_lobby(guild_id, channel_id)
+        return lobby["settings_json"] if lobby else {}
 
-                return {}
+    async def get_lobby_setting(
+            self, guild_id: int, channel_id: int, key: str, default: Any = None
+    ) -> Any:
+        """Return one key of a lobby's settings, e.g. ``"MaxVoiceChannels"``."""
+        return await self._fetch_setting(
+            """
+            SELECT settings_json -> ? FROM lobbies
+            WHERE guild_id = ? AND channel_id = ?
+            """,
+            (guild_id, channel_id), key, default,
+        )
 
     async def update_lobby_setting(
         self, guild_id: int, channel_id: int, key: str, value: Any
     ) -> None:
         """Atomically set a single JSON key for a lobby."""
-        async with aiosqlite.connect(self.path) as db:
+        async with self._write() as db:
             await db.execute(
                 """
                 UPDATE lobbies
-                SET settings_json = json_set(settings_json, ?, ?)
+                SET settings_json = json_set(settings_json, ?, json(?))
                 WHERE guild_id = ? AND channel_id = ?
                 """,
-                (f"$.{key}", json.dumps(value), guild_id, channel_id),
+                (_json_path(key), _encode(value), guild_id, channel_id),
             )
             await db.commit()
+        self._lobby_cache.pop((guild_id, channel_id))
 
     async def delete_lobby(self, guild_id: int, channel_id: int) -> None:
         """Remove a lobby entry."""
-        async with aiosqlite.connect(self.path) as db:
+        async with self._write() as db:
             await db.execute(
                 """
                 DELETE FROM lobbies
@@ -397,3 +1348,7 @@ class DBHelper:
                 (guild_id, channel_id),
             )
             await db.commit()
+            self._lobby_ids.discard((guild_id, channel_id))
+            # ON DELETE CASCADE dropped the lobby's voice channels too
+            self._count_cache.pop((guild_id, channel_id), None)
+        self._lobby_cache.pop((guild_id, channel_id))
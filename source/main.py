@@ -1,3 +1,8 @@
+import asyncio
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
 from dotenv import load_dotenv
 
 # Load variables from .env into the process environment
@@ -5,9 +10,44 @@ load_dotenv()
 
 import utility_bot
 
-def main():
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Route every log record through a queue: the event loop only enqueues,
+    formatting and the (possibly pipe-bound) stdout write happen on the
+    listener's background thread.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(
+        "[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{"
+    ))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
 
-    utility_bot.BOT.run(token=utility_bot.TOKEN)
+    listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    return listener
+
+async def _run():
+    async with utility_bot.BOT:
+        try:
+            await utility_bot.BOT.start(token=utility_bot.TOKEN)
+        finally:
+            # Release the pooled DB connections before the loop goes away
+            await utility_bot.DB.close()
+
+def main():
+    listener = setup_logging()
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        # Ctrl-C – asyncio.run already cancelled _run, which closed the bot and DB
+        pass
+    finally:
+        listener.stop()     # flush whatever is still queued
 
 if __name__ == "__main__":
     main()
@@ -13,22 +13,100 @@ import discord
 from discord.ext import commands, tasks
 import time
 import asyncio
-from typing import Optional, Dict
+import heapq
+import logging
+import sqlite3
+from itertools import count, groupby
+from operator import itemgetter
+from contextlib import asynccontextmanager
+from typing import Optional, AsyncIterator, Dict, Tuple
 
-from data.db_helper import DBHelper          # <-- Custom database helper
+from data.db_helper import DBHelper, FLAG_PRIVATE   # <-- Custom database helper
 
 # ----------------------------------------------------------------------
 #  Bot & DB initialisation
 # ----------------------------------------------------------------------
-INTENTS = discord.Intents.all()
-
-BOT = commands.Bot(command_prefix="g!", intents=INTENTS)
+# Only what the bot reacts to: guild/channel state, voice joins/leaves and
+# the text of "g!" prefix commands – no presences, members, reactions,
+# typing or any other event Intents.default() would subscribe to
+INTENTS = discord.Intents.none()
+INTENTS.guilds = True
+INTENTS.voice_states = True
+INTENTS.guild_messages = True
+INTENTS.message_content = True
+
+BOT = commands.Bot(
+    command_prefix="g!",
+    intents=INTENTS,
+    max_messages=None,               # no message cache – nothing reads old messages
+    chunk_guilds_at_startup=False,   # don't download every member list on connect
+)
 DB  = DBHelper()                     # singleton for the whole process
 
+log = logging.getLogger(__name__)
+
 # ----------------------------------------------------------------------
 #  Constants & Functions
 # ----------------------------------------------------------------------
 CHECK_INTERVAL = 2 * 60   # seconds
+VOICE_DEBOUNCE = 0.4      # seconds a member's voice state must settle before we act
+PRUNE_CONCURRENCY = 10    # channel deletions in flight at once while pruning
+
+# Permission templates for temporary rooms – shared, never mutated
+# (discord.py only reads them when it serialises the channel payload)
+PUBLIC_ROOM_OVERWRITE  = discord.PermissionOverwrite(connect=True, speak=True)
+PRIVATE_ROOM_OVERWRITE = discord.PermissionOverwrite(connect=False)
+ROOM_OWNER_OVERWRITE   = discord.PermissionOverwrite(manage_channels=True, connect=True, speak=True)
+
+_background_tasks: set[asyncio.Task] = set()     # strong refs until they finish
+
+def _background(coro, what: str) -> asyncio.Task:
+    """Run ``coro`` without awaiting it; failures are logged instead of lost."""
+    def _done(task: asyncio.Task) -> None:
+        _background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Error while %s", what, exc_info=task.exception())
+
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_done)
+    return task
+
+# Messages waiting to be deleted: heap of (due monotonic time, seq, message).
+# One worker task serves them all instead of one sleeping task per message.
+_pending_deletes: list[tuple[float, int, discord.Message]] = []
+_pending_seq = count()                       # tie-breaker – Messages don't compare
+_pending_wakeup = asyncio.Event()            # set when a new earliest deadline arrives
+_deletion_task: Optional[asyncio.Task] = None
+
+async def _delete_quietly(message: discord.Message) -> None:
+    try:
+        await message.delete()
+    except (discord.NotFound, discord.Forbidden):
+        # Message already gone or we lack perms – just ignore
+        pass
+
+async def _deletion_worker() -> None:
+    """Sleeps until the earliest deadline, then deletes every message that is due."""
+    while True:
+        if _pending_deletes:
+            delay = _pending_deletes[0][0] - time.monotonic()
+        else:
+            delay = None
+
+        if delay is None or delay > 0:
+            try:
+                await asyncio.wait_for(_pending_wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            _pending_wakeup.clear()
+            continue
+
+        now = time.monotonic()
+        due = []
+        while _pending_deletes and _pending_deletes[0][0] <= now:
+            due.append(heapq.heappop(_pending_deletes)[2])
+        await asyncio.gather(*(_delete_quietly(message) for message in due), return_exceptions=True)
 
 async def send_temporary(
     channel: discord.abc.Messageable,
@@ -46,21 +124,35 @@ async def send_temporary(
     """
     msg = await channel.send(content, **send_kwargs)
 
-    # Define a tiny coroutine that waits then deletes the message
-    async def _deleter(message: discord.Message, delay: float):
-        try:
-            await asyncio.sleep(delay)
-            await message.delete()
-        except (discord.NotFound, discord.Forbidden):
-            # Message already gone or we lack perms – just ignore
-            pass
-
-    # Schedule the deleter as a background task (no awaiting here)
-    asyncio.create_task(_deleter(msg, delete_after))
+    # Queue it for the deletion worker; only wake it if this is the new earliest deadline
+    heapq.heappush(_pending_deletes, (time.monotonic() + delete_after, next(_pending_seq), msg))
+    if _pending_deletes[0][2] is msg:
+        _pending_wakeup.set()
 
     # Return the message in case the caller wants to do something else with it
     return msg
 
+async def _delete_room(channel: discord.VoiceChannel, reason: str) -> None:
+    """
+    Delete a temporary room on Discord, then its row. If Discord refuses, the
+    row is marked expired instead, so the prune task retries the deletion.
+    """
+    try:
+        await channel.delete(reason=reason)
+    except discord.NotFound:
+        pass                # already gone on Discord's side – only the row is left
+    except discord.HTTPException:
+        await DB.update_voice_last_disconnect(channel.guild.id, channel.id)
+        raise
+    await DB.delete_voice_channel(channel.guild.id, channel.id)
+
+async def _discard_unstored_room(channel: discord.VoiceChannel) -> None:
+    """Delete a freshly created room whose row could not be stored."""
+    try:
+        await channel.delete(reason="Could not store the new channel")
+    except discord.NotFound:
+        pass                # already gone
+
 # TODO: fix the command and make them all in the slash commands too
 # ----------------------------------------------------------------------
 #  COMMAND – let admins change the lobby channel
@@ -70,41 +162,71 @@ async def send_temporary(
 async def set_lobby(ctx: commands.Context, channel: discord.VoiceChannel):
     """Save a new lobby channel ID in the guild‑wide settings JSON."""
     guild_id = ctx.guild.id
-    print(f"DEBUG: channel {channel.id} guild {guild_id}")
-    a = await DB.get_lobby(guild_id, channel.id)
-    print(f"{a}")
-    if a is not None:
+    log.debug("setlobby: channel %s guild %s", channel.id, guild_id)
+    if DB.is_lobby(guild_id, channel.id):
         await ctx.reply(f"❌ **{channel.name}** is already a lobby channel.")
         return
 
-    await DB.set_lobby(guild_id, channel.id, await DB.get_settings_guild(guild_id))
+    await DB.set_lobby(guild_id, channel.id)
     await ctx.reply(f"✅ New lobby channel linked **{channel.name}**", ephemeral=True)
 
 
 # ----------------------------------------------------------------------
 #  EVENT – voice state updates (join detection)
 # ----------------------------------------------------------------------
+# (guild_id, member_id) -> [lock, holders + waiters]; the last one out drops it
+_member_locks: Dict[Tuple[int, int], list] = {}
+
+@asynccontextmanager
+async def _member_lock(guild_id: int, member_id: int) -> AsyncIterator[None]:
+    """Serialise one member's room creation without blocking anybody else."""
+    key = (guild_id, member_id)
+    entry = _member_locks.setdefault(key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _member_locks[key]
+
 async def handle_lobby_update(
         member: discord.Member,
         after: discord.VoiceState
 ):
     guild_id = after.channel.guild.id
-    lobby = await DB.get_lobby(guild_id, after.channel.id)
-    if not lobby:
+    if not DB.is_lobby(guild_id, after.channel.id):
         return  # they joined some other channel
 
-    member_voice_count = await DB.get_count_voice_channel_by_member(guild_id, member.id, after.channel.id)
-    print(f"DEBUG: {member_voice_count} - Lobby:{lobby}")
-    if member_voice_count < lobby['settings_json']['MaxVoiceChannels']:
+    # Two joins of the same member must not both pass the limit check below
+    async with _member_lock(guild_id, member.id):
+        await _create_lobby_room(member, after)
+
+async def _create_lobby_room(
+        member: discord.Member,
+        after: discord.VoiceState
+):
+    guild_id = after.channel.guild.id
+    join = await DB.get_lobby_join_context(guild_id, after.channel.id, member.id)
+    if join is None:
+        return
+    lobby, member_voice_count, lobby_voice_count = join
+    settings = lobby['settings']
+    if settings is None:
+        log.warning("Lobby %s on guild %s has no MaxVoiceChannels/NameDefaults set", after.channel.id, guild_id)
+        return
+
+    log.debug("Member owns %s channel(s) - Lobby: %s", member_voice_count, lobby)
+    if member_voice_count < settings.max_voice_channels:
         try:
-            vc_name = str(lobby['settings_json']['NameDefaults']['general'])
+            vc_name = settings.name_default_general
             if vc_name.find("%num%") != -1:
-                num = await DB.get_count_voice_channels(guild_id, lobby['channel_id'])
-                vc_name = vc_name.replace("%num%", str(num))
+                vc_name = vc_name.replace("%num%", str(lobby_voice_count))
 
             vc_name = vc_name.replace("%randnum%", str(randint(0, 1000)))
 
-            print(f"DEBUG: {vc_name}")
+            log.debug("Creating voice channel %s", vc_name)
             new_vc = await after.channel.guild.create_voice_channel(
                 name=vc_name,
                 category=after.channel.category,
@@ -112,49 +234,71 @@ async def handle_lobby_update(
                 bitrate=int(after.channel.guild.bitrate_limit)
             )
 
-            print(f"Voice channel created {new_vc.id}")
-
-            await member.move_to(channel=new_vc, reason="Moving to the new requested channel")
-
-            await DB.set_voice_channel(
-                channel_id=new_vc.id,
-                guild_id=guild_id,
-                lobby_id=lobby['channel_id'],
-                owner_id=member.id
+            log.info("Voice channel created %s", new_vc.id)
+
+            # The move and the INSERT don't depend on each other – overlap them
+            moved, stored = await asyncio.gather(
+                member.move_to(channel=new_vc, reason="Moving to the new requested channel"),
+                DB.set_voice_channel(
+                    channel_id=new_vc.id,
+                    guild_id=guild_id,
+                    lobby_id=lobby['channel_id'],
+                    owner_id=member.id
+                ),
+                return_exceptions=True,
             )
-
-        except discord.HTTPException:
-            print(f"Could not create voice channel for member {member.id}. Notifying member through DM")
+            if isinstance(stored, BaseException):
+                # Without a row the room would never expire or be pruned – and the
+                # member may already be sitting in it, so it can't stay either
+                await _discard_unstored_room(new_vc)
+                raise stored
+            if isinstance(moved, BaseException):
+                # Nobody will ever join or leave the room – it would never expire
+                # and would hold one of the member's slots, so remove it right away
+                await _delete_room(new_vc, "Member could not be moved into the new channel")
+                raise moved
+
+        except (discord.HTTPException, sqlite3.Error) as e:
+            log.warning("Could not create voice channel for member %s (%s). Notifying member through DM", member.id, e)
             try:
                 dm = await member.create_dm()
-                await dm.send(
-                    content="Sorry we are having some issues with creating voice channels please try reconnecting or try again later.",
+                await send_temporary(
+                    dm,
+                    "Sorry we are having some issues with creating voice channels please try reconnecting or try again later.",
                     delete_after=120
                 )
             finally:
                 return
 
-        print("Creating voice channel completed")
+        log.info("Creating voice channel completed")
     else:
-        await after.channel.send(
-            content=f"{member.mention}\nYou already reached the maximum created channels ({lobby['settings_json']['MaxVoiceChannels']}) for this Lobby. Please use one of your created channels or contact admin if there is a issue.",
+        await send_temporary(
+            after.channel,
+            f"{member.mention}\nYou already reached the maximum created channels ({settings.max_voice_channels}) for this Lobby. Please use one of your created channels or contact admin if there is a issue.",
             delete_after=60
         )
 
-async def handle_voice_leave(member: discord.Member, before: discord.VoiceState):
-    guild_id = before.channel.guild.id
-    chan = await DB.get_voice_channel(guild_id, before.channel.id)
-    print(f"DEBUG: handle_voice_leave {chan}")
+async def handle_voice_leave(member: discord.Member, channel: discord.VoiceChannel):
+    guild_id = channel.guild.id
+    chan = await DB.get_voice_channel(guild_id, channel.id)
+    log.debug("handle_voice_leave %s", chan)
     if chan is None:
         return
 
-    if len(before.channel.voice_states) > 0:
+    if len(channel.voice_states) > 0:
         return              # if there is still someone in the channel
 
-    await DB.update_voice_last_disconnect(guild_id, before.channel.id, int(time.time()) + (5 * 60))
+    await DB.update_voice_last_disconnect(guild_id, channel.id, time.time_ns() // 1_000_000_000 + (5 * 60))
+
+    log.debug("Updated last_disconnect on %s", channel.name)
 
-    print(f"DEBUG: Updated last_disconnect on {before.channel.name}")
 
+# (guild_id, member_id) -> (timer, state before the burst, channels left during it)
+# while a change settles
+_pending_voice: Dict[
+    Tuple[int, int],
+    Tuple[asyncio.TimerHandle, discord.VoiceState, list[discord.VoiceChannel]],
+] = {}
 
 @BOT.event
 async def on_voice_state_update(
@@ -162,21 +306,63 @@ async def on_voice_state_update(
     before: discord.VoiceState,
     after: discord.VoiceState,
 ) -> None:
-    """Detect when a user joins the lobby voice channel and start the flow."""
+    """
+    Debounce voice state changes: a burst of joins/leaves/moves is coalesced
+    per member and handled once the member has been still for
+    ``VOICE_DEBOUNCE`` seconds – joins by the net change (first ``before`` →
+    last ``after``), leaves for every channel left along the way.
+    """
     # --------------------------------------------------------------
     # Guard clauses
     # --------------------------------------------------------------
     if member.bot:
         return                      # ignore bots
 
-    if before.channel == after.channel:
-        return
+    key = (member.guild.id, member.id)
+    pending = _pending_voice.pop(key, None)
+    if pending is not None:
+        timer, first_before, left = pending     # keep the state from before the burst
+        timer.cancel()
+    elif before.channel == after.channel:
+        return                      # mute/deafen etc. – nothing to settle
+    else:
+        first_before, left = before, []
+
+    # A room passed through mid-burst (e.g. moved into it, then disconnected)
+    # still has to start expiring
+    if before.channel is not None and before.channel != after.channel and before.channel not in left:
+        left.append(before.channel)
+
+    timer = asyncio.get_running_loop().call_later(
+        VOICE_DEBOUNCE, _dispatch_voice_change, key, member, first_before, after, left
+    )
+    _pending_voice[key] = (timer, first_before, left)
+
+
+def _dispatch_voice_change(
+    key: Tuple[int, int],
+    member: discord.Member,
+    before: discord.VoiceState,
+    after: discord.VoiceState,
+    left: list[discord.VoiceChannel],
+) -> None:
+    del _pending_voice[key]
+    _background(_process_voice_change(member, before, after, left), "handling a voice state update")
+
 
-    if after.channel is not None:
+async def _process_voice_change(
+    member: discord.Member,
+    before: discord.VoiceState,
+    after: discord.VoiceState,
+    left: list[discord.VoiceChannel],
+) -> None:
+    """Detect when a user joins the lobby voice channel and start the flow."""
+    if after.channel is not None and after.channel != before.channel:
         await handle_lobby_update(member, after)
 
-    if before.channel is not None:
-        await handle_voice_leave(member, before)
+    for channel in left:
+        if channel != after.channel:    # not if the burst ended back in it
+            await handle_voice_leave(member, channel)
 
     # await start_questionnaire(after, member)
 
@@ -190,7 +376,7 @@ async def start_questionnaire(voice_state: discord.VoiceState, member: discord.M
     """
 
 
-    view = _TypeSelectView(member)
+    view = _TypeSelectView(member, voice_state.channel.id)
     await voice_state.channel.send(
         "👋 Hi! I’m going to set up a voice channel for you.\n"
         "Please choose the type of room you’d like.",
@@ -200,15 +386,15 @@ async def start_questionnaire(voice_state: discord.VoiceState, member: discord.M
 
 class _TypeSelectView(discord.ui.View):
     """First step – pick “gaming” or “general”. """
-    def __init__(self, author: discord.Member):
+    def __init__(self, author: discord.Member, lobby_id: int):
         super().__init__(timeout=120)          # 2min auto‑close
         self.author = author
-        self.add_item(_TypeSelect(author))
+        self.add_item(_TypeSelect(author, lobby_id))
 
 
 class _TypeSelect(discord.ui.Select):
     """Dropdown with the two possible types."""
-    def __init__(self, author: discord.Member):
+    def __init__(self, author: discord.Member, lobby_id: int):
         options = [
             discord.SelectOption(
                 label="Gaming room",
@@ -228,25 +414,28 @@ class _TypeSelect(discord.ui.Select):
             options=options,
         )
         self.author = author
+        self.lobby_id = lobby_id     # the room is stored under the lobby it was asked for in
 
     async def callback(self, interaction: discord.Interaction):
         # Only the user who started the flow may interact
         if interaction.user.id != self.author.id:
-            await interaction.followup.send_message(
+            await interaction.response.send_message(
                 "❌ This menu isn’t for you.", ephemeral=True
             )
             return
 
         type_purpose = self.values[0]
-        await interaction.followup.defer()
 
         if type_purpose == "gaming":
-            await interaction.followup.send_modal(_GameNameModal(self.author, type_purpose))
+            # A modal has to be the first response – it can't follow a defer()
+            await interaction.response.send_modal(_GameNameModal(self.author, type_purpose, self.lobby_id))
         else:
             # General room – we can create it immediately
+            await interaction.response.defer()
             await _create_temp_room(
                 interaction,
-                channel_name=type_purpose,
+                lobby_id=self.lobby_id,
+                purpose=type_purpose,
             )
 
 
@@ -259,21 +448,24 @@ class _GameNameModal(discord.ui.Modal, title="Game selection"):
         max_length=50,
     )
 
-    def __init__(self, author: discord.Member, purpose: str):
+    def __init__(self, author: discord.Member, purpose: str, lobby_id: int):
         super().__init__()
         self.author = author
         self.purpose = purpose
+        self.lobby_id = lobby_id
 
     async def on_submit(self, interaction: discord.Interaction):
         if interaction.user.id != self.author.id:
-            await interaction.followup.send_message(
+            await interaction.response.send_message(
                 "❌ Not your modal.", ephemeral=True
             )
             return
 
         channel_name = self.game.value.strip() or "Unknown"
+        await interaction.response.defer()      # channel creation may take longer than 3s
         await _create_temp_room(
             interaction,
+            lobby_id=self.lobby_id,
             purpose=self.purpose,
             channel_name=channel_name,
         )
@@ -285,6 +477,7 @@ class _GameNameModal(discord.ui.Modal, title="Game selection"):
 async def _create_temp_room(
     interaction: discord.Interaction,
     *,
+    lobby_id: int,
     purpose: str,
     channel_name: Optional[str] = None,
 ) -> None:
@@ -301,35 +494,45 @@ async def _create_temp_room(
     else:
         base_name = "General Chat"
 
-    existing = [c for c in guild.voice_channels if c.name.startswith(base_name)]
-    suffix = len(existing) + 1 if existing else ""
+    n = await DB.next_room_suffix(guild.id, base_name)
+    suffix = n if n > 1 else ""
     channel_name = f"{base_name}{suffix}"
 
     # ----- Permission overwrites -----------------------------------------
     overwrites = {
-        guild.default_role: discord.PermissionOverwrite(connect=True, speak=True),
-        author: discord.PermissionOverwrite(
-            manage_channels=True, connect=True, speak=True
-        ),
+        guild.default_role: PUBLIC_ROOM_OVERWRITE,
+        author: ROOM_OWNER_OVERWRITE,
     }
 
     # ----- Create the voice channel ---------------------------------------
-    new_vc = await guild.create_voice_channel(
-        name=channel_name,
-        overwrites=overwrites,
-        reason=f"Temporary channel created for {author}",
-    )
+    try:
+        new_vc = await guild.create_voice_channel(
+            name=channel_name,
+            overwrites=overwrites,
+            reason=f"Temporary channel created for {author}",
+        )
+    except discord.HTTPException:
+        await DB.release_room_suffix(guild.id, base_name, n)   # no room – hand the number back
+        raise
 
     # ----- Store metadata ---------------------------
-    await DB.set_voice_channel(
-        channel_id=new_vc.id,
-        guild_id=guild.id,
-        owner_id=author.id,
-        purpose=purpose or None,
-        channel_name=channel_name,
-        private=False,
-        extra={"created_at": int(time.time())},
-    )
+    try:
+        await DB.set_voice_channel(
+            channel_id=new_vc.id,
+            guild_id=guild.id,
+            lobby_id=lobby_id,
+            owner_id=author.id,
+            purpose=purpose or None,
+            channel_name=channel_name,
+            extra={"created_at": time.time_ns() // 1_000_000_000},
+            base_name=base_name,        # deleting the row releases the suffix
+            name_suffix=n,
+        )
+    except Exception:
+        # Without a row nothing would ever expire the room or free its number
+        await DB.release_room_suffix(guild.id, base_name, n)
+        await _discard_unstored_room(new_vc)
+        raise
 
     # ----- Send the embed with control buttons ---------------------------
     embed = discord.Embed(
@@ -354,24 +557,58 @@ async def _create_temp_room(
 # ----------------------------------------------------------------------
 #  BUTTON VIEW – rename / toggle privacy / delete
 # ----------------------------------------------------------------------
-class _ChannelControlView(discord.ui.View):
-    """Three buttons that only the channel owner may press."""
-    def __init__(self, vc_id: int, owner_id: int):
-        super().__init__(timeout=None)   # persistent view if you ever need it
+class _ChannelControlButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"vc:(?P<action>rename|private|delete):(?P<vc_id>[0-9]+):(?P<owner_id>[0-9]+)",
+):
+    """
+    One owner control button. Channel and owner travel in the ``custom_id``,
+    so the single registered class answers presses for every temporary room
+    (even after a restart) and no View object is kept alive per room.
+    """
+    BUTTONS = {
+        "rename":  ("Rename", discord.ButtonStyle.primary),
+        "private": ("Make private", discord.ButtonStyle.secondary),
+        "delete":  ("Delete now", discord.ButtonStyle.danger),
+    }
+
+    def __init__(self, action: str, vc_id: int, owner_id: int, private: bool = False):
+        label, style = self.BUTTONS[action]
+        if action == "private" and private:
+            label = "Make public"
+        super().__init__(
+            discord.ui.Button(label=label, style=style, custom_id=f"vc:{action}:{vc_id}:{owner_id}")
+        )
+        self.action   = action
         self.vc_id    = vc_id
         self.owner_id = owner_id
 
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Button, match
+    ) -> "_ChannelControlButton":
+        return cls(match["action"], int(match["vc_id"]), int(match["owner_id"]))
+
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if interaction.user.id != self.owner_id:
-            await interaction.followup.send_message(
+            await interaction.response.send_message(
                 "❌ Only the channel owner can use these controls.", ephemeral=True
             )
             return False
         return True
 
+    async def callback(self, interaction: discord.Interaction):
+        if self.action == "rename":
+            await self.rename(interaction)
+        elif self.action == "private":
+            await self.toggle_private(interaction)
+        else:
+            await self.delete_now(interaction)
+
     # ---------- Rename ---------------------------------------------------
-    @discord.ui.button(label="Rename", style=discord.ButtonStyle.primary)
-    async def rename(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def rename(self, interaction: discord.Interaction):
+        vc_id = self.vc_id
+
         class _RenameModal(discord.ui.Modal, title="Rename Voice Channel"):
             new_name = discord.ui.TextInput(
                 label="New channel name",
@@ -381,61 +618,80 @@ class _ChannelControlView(discord.ui.View):
             )
 
             async def on_submit(self, modal_inter: discord.Interaction):
-                vc = interaction.guild.get_channel(self.vc_id)
+                vc = interaction.guild.get_channel(vc_id)
                 if not vc:
-                    await modal_inter.followup.send_message(
+                    await modal_inter.response.send_message(
                         "⚠️ Channel not found.", ephemeral=True
                     )
                     return
+                # Renames are heavily rate limited – acknowledge before editing
+                await modal_inter.response.defer(ephemeral=True, thinking=True)
                 await vc.edit(name=self.new_name.value)
-                await modal_inter.followup.send_message(
+                await modal_inter.followup.send(
                     f"✅ Channel renamed to **{self.new_name.value}**", ephemeral=True
                 )
 
-        await interaction.followup.send_modal(_RenameModal())
+        await interaction.response.send_modal(_RenameModal())
 
     # ---------- Toggle privacy -------------------------------------------
-    @discord.ui.button(label="Make private", style=discord.ButtonStyle.secondary)
-    async def toggle_private(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def toggle_private(self, interaction: discord.Interaction):
         vc = interaction.guild.get_channel(self.vc_id)
         if not vc:
-            await interaction.followup.send_message("⚠️ Channel not found.", ephemeral=True)
+            await interaction.response.send_message("⚠️ Channel not found.", ephemeral=True)
             return
+        await interaction.response.defer(ephemeral=True, thinking=True)
 
-        # Load current flag from DB (fallback to False)
-        row = await DB.get_voice_channel(vc.id)
-        current_private = row.get("private", False) if row else False
-        new_private = not current_private
+        # Flip the flag in the DB – read and write in one statement, so two
+        # quick presses can't both see the same old value (unknown row → private)
+        flags = await DB.update_voice_channel_flags(interaction.guild.id, vc.id, toggle_mask=FLAG_PRIVATE)
+        new_private = bool(flags & FLAG_PRIVATE) if flags is not None else True
 
-        # Update Discord permissions
+        # Update Discord permissions in the background – the reply only waits for the DB
         overwrites = {
-            interaction.guild.default_role: discord.PermissionOverwrite(
-                connect=not new_private
-            ),
-            interaction.user: discord.PermissionOverwrite(
-                manage_channels=True, connect=True
-            ),
+            interaction.guild.default_role: PRIVATE_ROOM_OVERWRITE if new_private else PUBLIC_ROOM_OVERWRITE,
+            interaction.user: ROOM_OWNER_OVERWRITE,
         }
-        await vc.edit(overwrites=overwrites)
-
-        # Persist the new flag (whole‑JSON replace)
-        settings = row.get("settings", {}) if row else {}
-        settings["private"] = new_private
-        await DB.set_voice_channel_settings(vc.id, settings)
-
-        button.label = "Make public" if new_private else "Make private"
-        await interaction.followup.send_message(
+        _background(vc.edit(overwrites=overwrites), f"updating permissions of channel {vc.id}")
+
+        # The button is rebuilt from its custom_id on every press – the label on
+        # Discord only changes by editing the message
+        if interaction.message is not None:
+            _background(
+                interaction.message.edit(view=_ChannelControlView(self.vc_id, self.owner_id, new_private)),
+                f"updating the controls of channel {vc.id}",
+            )
+        await interaction.followup.send(
             f"🔒 Channel is now {'private' if new_private else 'public'}.", ephemeral=True
         )
 
     # ---------- Delete now -----------------------------------------------
-    @discord.ui.button(label="Delete now", style=discord.ButtonStyle.danger)
-    async def delete_now(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def delete_now(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True, thinking=True)
         vc = interaction.guild.get_channel(self.vc_id)
         if vc:
-            await vc.delete(reason="Owner requested early deletion")
-        await DB.delete_voice_channel(guild_id=interaction.guild.id, channel_id=self.vc_id)
-        await interaction.followup.send_message("✅ Channel deleted.", ephemeral=True)
+            # The row only goes once Discord has deleted the channel – if that
+            # fails it is left expired for the prune task to retry
+            _background(_delete_room(vc, "Owner requested early deletion"), f"deleting channel {vc.id}")
+        else:
+            await DB.delete_voice_channel(guild_id=interaction.guild.id, channel_id=self.vc_id)
+        await interaction.followup.send("✅ Channel deleted.", ephemeral=True)
+
+
+class _ChannelControlView(discord.ui.View):
+    """
+    Three buttons that only the channel owner may press. Built only to attach
+    the buttons to a message – being fully dynamic, the view store keeps the
+    button class, not this object.
+    """
+    def __init__(self, vc_id: int, owner_id: int, private: bool = False):
+        super().__init__(timeout=None)
+        for action in _ChannelControlButton.BUTTONS:
+            self.add_item(_ChannelControlButton(action, vc_id, owner_id, private))
+
+
+# Registered once at import, before login – presses on rooms made before a
+# restart are routed here as soon as the gateway is up
+BOT.add_dynamic_items(_ChannelControlButton)
 
 
 # ----------------------------------------------------------------------
@@ -444,36 +700,89 @@ class _ChannelControlView(discord.ui.View):
 @tasks.loop(seconds=CHECK_INTERVAL)
 async def _prune_expired():
     """Runs every 5min, deletes DB rows & Discord channels that have expired."""
-    # print("DEBUG: running prune_expired task")
-    async for guild_id, channel_id, lobby_id, last_dc_time, settings in DB.iterate_voice_rows():
-        guild = BOT.get_guild(guild_id)
-        channel = guild.get_channel(channel_id)
+    # log.debug("Running prune_expired task")
+    # Only rows past their expiry come back, a page at a time and grouped by guild
+    async for page in DB.iter_expired_voice_pages():
+        expired: list[discord.VoiceChannel] = []
+        stale: list[tuple[int, int]] = []       # rows whose channel is already gone
 
-        if last_dc_time is None:
-            # print(f"DEBUG: Nothing to do")
-            continue
+        for guild_id, rows in groupby(page, key=itemgetter(0)):
+            guild = BOT.get_guild(guild_id)     # one lookup per guild
+            if guild is None:
+                continue            # not (or no longer) on this guild – keep its rows
 
-        if len(channel.voice_states) > 0:
-            # await DB.update_voice_last_disconnect(guild_id, channel_id)
-            print(f"DEBUG: Members are still in channel {channel.name} skipping...")
-            continue
+            for _, channel_id in rows:
+                channel = guild.get_channel(channel_id)
+                if channel is None:
+                    stale.append((guild_id, channel_id))
+                    continue
+
+                if len(channel.voice_states) > 0:
+                    # await DB.update_voice_last_disconnect(guild_id, channel_id)
+                    log.debug("Members are still in channel %s, skipping...", channel.name)
+                    continue
+
+                expired.append(channel)
+
+        if expired or stale:
+            await _delete_expired(expired, stale)
+
+
+async def _delete_expired(expired: list[discord.VoiceChannel], stale: list[tuple[int, int]]) -> None:
+    """
+    Delete one page of expired rooms – at most PRUNE_CONCURRENCY Discord calls
+    in flight, then the rows of every room that is really gone in one statement.
+    """
+    limit = asyncio.Semaphore(PRUNE_CONCURRENCY)
 
-        if last_dc_time > int(time.time()):
-            print(f"DEBUG: Channel {channel.name} did not reach its expiry yet, skipping...")
+    async def delete_one(channel: discord.VoiceChannel) -> None:
+        async with limit:
+            try:
+                await channel.delete(reason="Auto-deleting channel due to long inactivity")
+            except discord.NotFound:
+                pass    # already gone on Discord's side – only the row is left
+
+    results = await asyncio.gather(*map(delete_one, expired), return_exceptions=True)
+
+    deleted = []
+    for channel, result in zip(expired, results):
+        if isinstance(result, discord.HTTPException):
+            # keep the row so the next prune pass retries it
+            log.error("Error while deleting channel %s on guild %s: %s", channel.name, channel.guild.name, result)
             continue
+        if isinstance(result, BaseException):
+            raise result
+        deleted.append((channel.guild.id, channel.id))
+        log.info("Deleted channel %s on guild %s due to inactivity", channel.name, channel.guild.name)
 
-        try:
-            await channel.delete(reason="Auto-deleting channel due to long inactivity")
-        except discord.HTTPException as e:
-            print(f"Error while deleting channel {channel.name} on guild {guild.name}: {e}")
-        finally:
-            await DB.delete_voice_channel(guild_id, channel_id)
-            print(f"Deleted channel {channel.name} on guild {guild.name} due to inactivity")
+    await DB.delete_voice_channels_bulk([*stale, *deleted])
+
+
+@tasks.loop(minutes=15)
+async def _optimize_db():
+    """Refresh SQLite's query-planner statistics and keep the WAL file small."""
+    await DB.optimize()
 
 
+async def _setup_hook() -> None:
+    """
+    Runs once after login, before the gateway connects – voice events can
+    arrive ahead of on_ready, so the DB has to be open by then.
+    """
+    await DB.init()          # ensure tables exist
+    await DB.optimize()
+
+BOT.setup_hook = _setup_hook
+
 
 @BOT.event
 async def on_ready():
-    await DB.init()          # ensure tables exist
-    _prune_expired.start()
-    print(f"✅ Bot ready as {BOT.user}")
\ No newline at end of file
+    global _deletion_task
+    # on_ready fires again after every reconnect – the loops are already running then
+    if not _prune_expired.is_running():
+        _prune_expired.start()
+    if not _optimize_db.is_running():
+        _optimize_db.start()
+    if _deletion_task is None:
+        _deletion_task = asyncio.create_task(_deletion_worker())
+    log.info("✅ Bot ready as %s", BOT.user)
\ No newline at end of file